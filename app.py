@@ -1,10 +1,17 @@
 import streamlit as st
 from groq import Groq
 import json
+import copy
 import os
 import requests
 from datetime import datetime
 import hashlib
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import numpy as np
 import plotly.express as px
 from fpdf import FPDF
 
@@ -20,6 +27,15 @@ else:
 ADMIN_PASSWORD = "admin123"
 APP_URL = "https://interview-agent-hdyuwl2pijewxvdbgkw7xu.streamlit.app"
 JSONBIN_API = "https://api.jsonbin.io/v3"
+OUTBOX_PATH = "/tmp/interview_outbox.jsonl"
+OUTBOX_FLUSH_INTERVAL = 2
+OUTBOX_MAX_BACKOFF = 60
+SEARCH_INDEX_PATH = "/tmp/interview_search.db"
+# Control characters never appear in reports, so they can't be confused with the report's own markdown
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+MIN_SCORE_COVERAGE = 0.5
+SCORE_CATEGORIES = ["Technical Knowledge", "Communication", "Problem Solving", "Confidence", "Overall"]
 
 # ════════════════════════════════════════════════════
 # DATABASE FUNCTIONS (JSONBin - persistent across users)
@@ -30,15 +46,34 @@ def get_headers():
         "Content-Type": "application/json"
     }
 
+def empty_db():
+    return {"candidates": [], "schedules": [], "question_bank": {}}
+
+def fetch_db(bin_id, headers):
+    res = requests.get(f"{JSONBIN_API}/b/{bin_id}/latest", headers=headers, timeout=10)
+    res.raise_for_status()
+    return res.json().get("record", empty_db())
+
+def put_db(bin_id, headers, data):
+    res = requests.put(f"{JSONBIN_API}/b/{bin_id}", headers=headers, json=data, timeout=10)
+    res.raise_for_status()
+
 def load_db():
     bin_id = st.secrets.get("JSONBIN_BIN_ID", "")
     if not bin_id:
-        return {"candidates": [], "schedules": [], "question_bank": {}}
+        return empty_db()
     try:
-        res = requests.get(f"{JSONBIN_API}/b/{bin_id}/latest", headers=get_headers(), timeout=10)
-        return res.json().get("record", {"candidates": [], "schedules": [], "question_bank": {}})
+        db = fetch_db(bin_id, get_headers())
+        st.session_state.db_load_failed = False
     except:
-        return {"candidates": [], "schedules": [], "question_bank": {}}
+        db = empty_db()
+        st.session_state.db_load_failed = True
+    # Overlay mutations that are journaled locally but not yet flushed upstream
+    outbox = get_outbox()
+    if outbox:
+        for mutation in outbox.pending_mutations():
+            apply_mutation(db, mutation)
+    return db
 
 def save_db(data):
     bin_id = st.secrets.get("JSONBIN_BIN_ID", "")
@@ -55,54 +90,301 @@ def save_db(data):
         except Exception as e:
             st.error(f"Failed to create bin: {e}")
         return
-    try:
-        requests.put(f"{JSONBIN_API}/b/{bin_id}", headers=get_headers(), json=data, timeout=10)
-    except:
-        pass
+    put_db(bin_id, get_headers(), data)
+
+def apply_mutation(db, mutation):
+    # Mutations are narrow and idempotent so they can be replayed onto the upstream record
+    if mutation["op"] == "set":
+        # Whole-key replacement, only written by older journals
+        db[mutation["key"]] = mutation["value"]
+    elif mutation["op"] == "add_schedule":
+        schedules = db.setdefault("schedules", [])
+        if not any(s["token"] == mutation["schedule"]["token"] for s in schedules):
+            schedules.append(mutation["schedule"])
+    elif mutation["op"] == "mark_schedule_used":
+        for s in db.setdefault("schedules", []):
+            if s["token"] == mutation["token"]:
+                s["used"] = True
+    elif mutation["op"] == "add_questions":
+        questions = db.setdefault("question_bank", {}).setdefault(mutation["role"], [])
+        questions.extend(q for q in mutation["questions"] if q not in questions)
+    elif mutation["op"] == "delete_questions":
+        db.setdefault("question_bank", {}).pop(mutation["role"], None)
+    elif mutation["op"] == "add_round":
+        all_results = db.setdefault("candidates", [])
+        new_round = mutation["round"]
+        existing = next((c for c in all_results if c["candidate_name"] == mutation["candidate_name"] and c["role"] == mutation["role"]), None)
+        if existing:
+            existing["rounds"] = existing.get("rounds", [])
+            # Rounds carry the mutation id so replaying an already-flushed mutation is a no-op
+            if any(r.get("id") == new_round["id"] for r in existing["rounds"]):
+                return
+            existing["rounds"].append(new_round)
+            existing["last_updated"] = new_round["date"]
+        else:
+            all_results.append({
+                "candidate_name": mutation["candidate_name"],
+                "role": mutation["role"],
+                "date": new_round["date"],
+                "rounds": [new_round]
+            })
+
+# ════════════════════════════════════════════════════
+# WRITE-AHEAD OUTBOX (local journal, flushed to JSONBin in the background)
+# ════════════════════════════════════════════════════
+class Outbox:
+    def __init__(self, path, bin_id, headers):
+        self.path = path
+        self.bin_id = bin_id
+        self.headers = headers
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.pending = self._replay()
+        self.last_flush = None
+        self.last_error = None
+        self.backoff = OUTBOX_FLUSH_INTERVAL
+        if self.pending:
+            self.wake.set()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _replay(self):
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+        corrupt = False
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A torn line from a crash mid-append was never acknowledged
+                    corrupt = True
+        if corrupt:
+            # Drop the torn bytes so later appends start on a clean line
+            self._rewrite_journal(entries)
+        return entries
+
+    def append(self, mutation):
+        # Journal a private copy so callers can keep editing their objects
+        entry = {"id": uuid.uuid4().hex, "ts": time.time(), "mutation": copy.deepcopy(mutation)}
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending.append(entry)
+        self.wake.set()
+        return entry["id"]
+
+    def pending_mutations(self):
+        with self.lock:
+            return [copy.deepcopy(e["mutation"]) for e in self.pending]
+
+    def _rewrite_journal(self, entries):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for e in entries:
+                f.write(json.dumps(e) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                batch = list(self.pending)
+            if not batch:
+                return True
+            try:
+                db = fetch_db(self.bin_id, self.headers)
+                for e in batch:
+                    apply_mutation(db, e["mutation"])
+                put_db(self.bin_id, self.headers, db)
+            except Exception as e:
+                self.last_error = f"{datetime.now().strftime('%H:%M:%S')} — {e}"
+                return False
+            with self.lock:
+                # New entries may have been appended during the upload; keep only those.
+                # Trim memory only once the journal agrees, so a failed rewrite just retries.
+                remaining = self.pending[len(batch):]
+                self._rewrite_journal(remaining)
+                self.pending = remaining
+            self.last_flush = time.time()
+            self.last_error = None
+            return True
+
+    def _run(self):
+        while True:
+            if self.last_error:
+                # New appends must not cut the backoff short while JSONBin is failing
+                time.sleep(self.backoff)
+            else:
+                self.wake.wait(timeout=self.backoff)
+            self.wake.clear()
+            try:
+                flushed = self.flush()
+            except Exception as e:
+                # Local journal I/O failed; keep the thread alive and retry after backing off
+                self.last_error = f"{datetime.now().strftime('%H:%M:%S')} — {e}"
+                flushed = False
+            if flushed:
+                self.backoff = OUTBOX_FLUSH_INTERVAL
+            else:
+                self.backoff = min(self.backoff * 2, OUTBOX_MAX_BACKOFF)
+
+    def stats(self):
+        with self.lock:
+            depth = len(self.pending)
+            oldest = self.pending[0]["ts"] if self.pending else None
+        return {
+            "depth": depth,
+            "lag": time.time() - oldest if oldest else 0,
+            "last_flush": self.last_flush,
+            "last_error": self.last_error
+        }
+
+@st.cache_resource
+def get_outbox():
+    bin_id = st.secrets.get("JSONBIN_BIN_ID", "")
+    if not bin_id:
+        return None
+    return Outbox(OUTBOX_PATH, bin_id, get_headers())
+
+def record_mutation(mutation):
+    outbox = get_outbox()
+    if not outbox:
+        # No bin yet — save synchronously so the admin sees the bin-creation notice
+        db = load_db()
+        apply_mutation(db, mutation)
+        save_db(db)
+        return
+    outbox.append(mutation)
 
 def load_schedules():
     return load_db().get("schedules", [])
 
-def save_schedules(schedules):
-    db = load_db()
-    db["schedules"] = schedules
-    save_db(db)
+def save_schedule(schedule):
+    record_mutation({"op": "add_schedule", "schedule": schedule})
+
+def mark_schedule_used(token):
+    record_mutation({"op": "mark_schedule_used", "token": token})
 
 def load_all_candidates():
     return load_db().get("candidates", [])
 
 def save_candidate_result(candidate_name, jd_data, report, transcript, round_name, anticheat_flags):
-    db = load_db()
-    all_results = db.get("candidates", [])
-    existing = next((c for c in all_results if c["candidate_name"] == candidate_name and c["role"] == jd_data.get("role", "")), None)
     new_round = {
+        "id": uuid.uuid4().hex,
         "round_name": round_name,
         "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
         "report": report,
         "transcript": transcript,
         "anticheat_flags": anticheat_flags
     }
-    if existing:
-        existing["rounds"] = existing.get("rounds", [])
-        existing["rounds"].append(new_round)
-        existing["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-    else:
-        all_results.append({
-            "candidate_name": candidate_name,
-            "role": jd_data.get("role", ""),
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "rounds": [new_round]
-        })
-    db["candidates"] = all_results
-    save_db(db)
+    record_mutation({
+        "op": "add_round",
+        "candidate_name": candidate_name,
+        "role": jd_data.get("role", ""),
+        "round": new_round
+    })
+    get_search_index().add_round(candidate_name, jd_data.get("role", ""), new_round)
 
 def load_question_bank():
     return load_db().get("question_bank", {})
 
-def save_question_bank(bank):
-    db = load_db()
-    db["question_bank"] = bank
-    save_db(db)
+def save_questions(role, questions):
+    record_mutation({"op": "add_questions", "role": role, "questions": questions})
+
+def delete_questions(role):
+    record_mutation({"op": "delete_questions", "role": role})
+
+# ════════════════════════════════════════════════════
+# SEARCH INDEX (SQLite FTS5 over transcripts and reports)
+# ════════════════════════════════════════════════════
+def round_key(candidate_name, role, position, rnd):
+    # Rounds saved before ids existed are keyed by their place in the append-only rounds list
+    return rnd.get("id") or f"{candidate_name}|{role}|{position}|{rnd['round_name']}|{rnd['date']}"
+
+def format_transcript(transcript):
+    return "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in transcript])
+
+class SearchIndex:
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS rounds_fts USING fts5(
+                candidate_name, role, round_name, date UNINDEXED,
+                transcript, report, tokenize='porter unicode61'
+            )
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS round_keys (round_key TEXT PRIMARY KEY, fts_rowid INTEGER)")
+        self.conn.commit()
+
+    def _insert(self, key, candidate_name, role, rnd):
+        row = self.conn.execute("SELECT fts_rowid FROM round_keys WHERE round_key = ?", (key,)).fetchone()
+        if row:
+            self.conn.execute("DELETE FROM rounds_fts WHERE rowid = ?", (row[0],))
+        cur = self.conn.execute(
+            "INSERT INTO rounds_fts VALUES (?, ?, ?, ?, ?, ?)",
+            (candidate_name, role, rnd["round_name"], rnd["date"],
+             format_transcript(rnd.get("transcript", [])), rnd.get("report", ""))
+        )
+        self.conn.execute("INSERT OR REPLACE INTO round_keys VALUES (?, ?)", (key, cur.lastrowid))
+
+    def add_round(self, candidate_name, role, rnd):
+        with self.lock:
+            self._insert(rnd["id"], candidate_name, role, rnd)
+            self.conn.commit()
+
+    def sync(self, candidates):
+        # Index only what changed: rounds that are new or no longer in the DB
+        expected = {
+            round_key(c["candidate_name"], c["role"], position, rnd): (c, rnd)
+            for c in candidates
+            for position, rnd in enumerate(c.get("rounds", []))
+        }
+        with self.lock:
+            indexed = dict(self.conn.execute("SELECT round_key, fts_rowid FROM round_keys").fetchall())
+            stale = indexed.keys() - expected.keys()
+            missing = expected.keys() - indexed.keys()
+            if not stale and not missing:
+                return
+            for key in stale:
+                self.conn.execute("DELETE FROM rounds_fts WHERE rowid = ?", (indexed[key],))
+                self.conn.execute("DELETE FROM round_keys WHERE round_key = ?", (key,))
+            for key in missing:
+                c, rnd = expected[key]
+                self._insert(key, c["candidate_name"], c["role"], rnd)
+            self.conn.commit()
+
+    def search(self, query, limit=50):
+        sql = """
+            SELECT candidate_name, role, round_name, date,
+                   snippet(rounds_fts, -1, char(2), char(3), '…', 16), bm25(rounds_fts)
+            FROM rounds_fts WHERE rounds_fts MATCH ? ORDER BY bm25(rounds_fts) LIMIT ?
+        """
+        with self.lock:
+            try:
+                rows = self.conn.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # Not valid FTS syntax — match every word literally instead
+                terms = " ".join('"' + t.replace('"', '""') + '"' for t in query.split())
+                rows = self.conn.execute(sql, (terms, limit)).fetchall() if terms else []
+        return [
+            {"candidate_name": r[0], "role": r[1], "round_name": r[2], "date": r[3], "snippet": r[4], "rank": r[5]}
+            for r in rows
+        ]
+
+def render_snippet(snippet):
+    # Escape the report's own markdown, then turn the highlight sentinels into colour
+    text = re.sub(r"([\\`*_{}\[\]()#+\-.!|~<>$:])", r"\\\1", snippet.replace("\n", " "))
+    return text.replace(HIGHLIGHT_START, ":orange[").replace(HIGHLIGHT_END, "]")
+
+@st.cache_resource
+def get_search_index():
+    return SearchIndex(SEARCH_INDEX_PATH)
 
 # ════════════════════════════════════════════════════
 # HELPER FUNCTIONS
@@ -112,13 +394,7 @@ def generate_interview_token(candidate_name, role, round_name):
     return hashlib.md5(raw.encode()).hexdigest()[:10]
 
 def extract_score(report_text):
-    for line in report_text.split("\n"):
-        if "Overall" in line and "/10" in line:
-            try:
-                return float(line.split(":")[1].strip().replace("/10", ""))
-            except:
-                return 0
-    return 0
+    return extract_all_scores(report_text).get("Overall", 0)
 
 def extract_recommendation(report_text):
     for line in report_text.split("\n"):
@@ -127,17 +403,73 @@ def extract_recommendation(report_text):
     return "N/A"
 
 def extract_all_scores(report_text):
+    # Tolerates markdown and surrounding text, e.g. "**Communication:** 7/10 - clear" or
+    # "Confidence (1-10): 6/10"; categories whose score can't be read are left out rather than scored 0
     scores = {}
-    categories = ["Technical Knowledge", "Communication", "Problem Solving", "Confidence", "Overall"]
     for line in report_text.split("\n"):
-        for cat in categories:
-            if cat in line and "/10" in line:
-                try:
-                    scores[cat] = float(line.split(":")[1].strip().replace("/10", ""))
-                except:
-                    scores[cat] = 0
+        for cat in SCORE_CATEGORIES:
+            if cat in scores:
+                continue
+            match = re.search(re.escape(cat) + r".*?(\d+(?:\.\d+)?)\s*/\s*10\b", line)
+            if match and float(match.group(1)) <= 10:
+                scores[cat] = float(match.group(1))
     return scores
 
+def build_score_matrix(role_candidates):
+    # candidates × categories × rounds, NaN where a round or score is missing
+    round_names = sorted({r["round_name"] for c in role_candidates for r in c.get("rounds", [])})
+    round_index = {name: j for j, name in enumerate(round_names)}
+    scores = np.full((len(role_candidates), len(SCORE_CATEGORIES), len(round_names)), np.nan)
+    recommendations = []
+    for i, c in enumerate(role_candidates):
+        rounds = c.get("rounds", [])
+        for rnd in rounds:
+            j = round_index[rnd["round_name"]]
+            # A retaken round replaces the earlier attempt
+            scores[i, :, j] = np.nan
+            for cat, value in extract_all_scores(rnd.get("report", "")).items():
+                scores[i, SCORE_CATEGORIES.index(cat), j] = value
+        recommendations.append(extract_recommendation(rounds[-1].get("report", "")) if rounds else "N/A")
+    return {
+        "names": [c["candidate_name"] for c in role_candidates],
+        "rounds": round_names,
+        "scores": scores,
+        "recommendations": recommendations
+    }
+
+@st.cache_data(max_entries=50)
+def get_role_score_matrix(role, signature, _role_candidates):
+    # Only role and signature are hashed; the signature changes whenever a round is added
+    return build_score_matrix(_role_candidates)
+
+def rank_candidates(scores, round_idx, weights):
+    sub = scores[:, :, round_idx]
+    counts = (~np.isnan(sub)).sum(axis=2)
+    agg = np.where(counts > 0, np.nansum(sub, axis=2) / np.maximum(counts, 1), np.nan)
+    valid = ~np.isnan(agg)
+    filled = np.where(valid, agg, 0.0)
+
+    w = np.asarray(weights, dtype=float)
+    w_total = valid @ w
+    # Candidates missing too much of the weighted categories aren't ranked on a partial average
+    coverage = w_total / w.sum()
+    weighted = np.where(coverage >= MIN_SCORE_COVERAGE, (filled @ w) / np.where(w_total > 0, w_total, 1), np.nan)
+    scored = (valid & (w > 0)).sum(axis=1)
+
+    n_valid = valid.sum(axis=0)
+    mean = filled.sum(axis=0) / np.maximum(n_valid, 1)
+    std = np.sqrt((np.where(valid, agg - mean, 0.0) ** 2).sum(axis=0) / np.maximum(n_valid, 1))
+    z = np.where(valid & (std > 0), (agg - mean) / np.where(std > 0, std, 1), np.where(valid, 0.0, np.nan))
+
+    pct = np.full(agg.shape, np.nan)
+    for k in range(agg.shape[1]):
+        col = np.sort(agg[valid[:, k], k])
+        if len(col):
+            pct[valid[:, k], k] = np.searchsorted(col, agg[valid[:, k], k], side="right") / len(col) * 100
+
+    order = np.argsort(-np.where(np.isnan(weighted), -np.inf, weighted), kind="stable")
+    return {"agg": agg, "weighted": weighted, "scored": scored, "z": z, "pct": pct, "order": order}
+
 def analyze_anticheat(conversation_log):
     flags = []
     for i, msg in enumerate(conversation_log):
@@ -150,7 +482,7 @@ def analyze_anticheat(conversation_log):
     return flags if flags else ["No suspicious activity detected"]
 
 def generate_report(transcript, jd_data, round_name):
-    formatted = "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in transcript])
+    formatted = format_transcript(transcript)
     system = "You are a senior hiring manager. Evaluate interview transcripts objectively and provide detailed assessments."
     prompt = f"Evaluate this {round_name} round interview.\n"
     prompt += f"Role: {jd_data.get('role', '')}\n"
@@ -326,10 +658,7 @@ if is_candidate:
             st.session_state.match = match
             st.session_state.messages = [{"role": "assistant", "content": opening}]
             st.session_state.interview_done = False
-            for s in schedules:
-                if s["token"] == token:
-                    s["used"] = True
-            save_schedules(schedules)
+            mark_schedule_used(token)
             st.rerun()
 
     # ── DURING INTERVIEW ──
@@ -424,6 +753,22 @@ else:
         "📈 Analytics"
     ])
 
+    outbox = get_outbox()
+    if outbox:
+        stats = outbox.stats()
+        st.sidebar.divider()
+        st.sidebar.markdown("**💾 Save Queue**")
+        col1, col2 = st.sidebar.columns(2)
+        col1.metric("Journal Depth", stats["depth"])
+        col2.metric("Flush Lag", f"{stats['lag']:.0f}s")
+        if stats["last_flush"]:
+            st.sidebar.caption(f"Last flush: {datetime.fromtimestamp(stats['last_flush']).strftime('%H:%M:%S')}")
+        if stats["last_error"]:
+            st.sidebar.warning(f"Last flush failed: {stats['last_error']}")
+        if stats["depth"] and st.sidebar.button("🔄 Flush Now"):
+            outbox.flush()
+            st.rerun()
+
     if page == "📅 Scheduler":
         st.title("📅 Interview Scheduler")
         st.info("Generate a unique interview link for each candidate. They will only see the interview chat — nothing else.")
@@ -441,9 +786,8 @@ else:
 
         if submitted:
             if c_name and c_role:
-                schedules = load_schedules()
                 new_token = generate_interview_token(c_name, c_role, c_round)
-                schedules.append({
+                save_schedule({
                     "candidate_name": c_name,
                     "role": c_role,
                     "technical_skills": c_skills,
@@ -453,7 +797,6 @@ else:
                     "created": str(datetime.now()),
                     "used": False
                 })
-                save_schedules(schedules)
                 st.success(f"✅ Interview link generated for {c_name}!")
                 st.markdown("**📋 Send this link to the candidate:**")
                 full_link = f"{APP_URL}/?token={new_token}"
@@ -578,6 +921,22 @@ else:
         if not all_c:
             st.info("No interview data yet. Candidates need to complete their interviews first.")
         else:
+            search_index = get_search_index()
+            if st.session_state.get("db_load_failed"):
+                st.caption("⚠️ Could not reach JSONBin — search results may be out of date.")
+            else:
+                search_index.sync(all_c)
+            query = st.text_input("🔎 Search Transcripts & Reports", placeholder='e.g. Kafka, "weak on SQL", kafka AND spark')
+            if query:
+                started = time.perf_counter()
+                hits = search_index.search(query)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                st.caption(f"{len(hits)} match(es) in {elapsed_ms:.1f} ms")
+                for hit in hits:
+                    st.markdown(f"**{hit['candidate_name']}** — {hit['role']} — {hit['round_name']} — {hit['date']}")
+                    st.markdown("> " + render_snippet(hit["snippet"]))
+                st.divider()
+
             roles = list(set([c["role"] for c in all_c]))
             col1, col2 = st.columns(2)
             with col1:
@@ -633,25 +992,61 @@ else:
             if len(role_candidates) < 2:
                 st.warning(f"Only {len(role_candidates)} candidate(s) for this role. Need at least 2.")
             else:
-                names = [c["candidate_name"] for c in role_candidates]
-                selected_names = st.multiselect("Select Candidates to Compare", names, default=names[:2])
-                selected_candidates = [c for c in role_candidates if c["candidate_name"] in selected_names]
-                if len(selected_candidates) >= 2:
+                signature = tuple((c["candidate_name"], len(c.get("rounds", []))) for c in role_candidates)
+                matrix = get_role_score_matrix(selected_role, signature, role_candidates)
+
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    selected_rounds = st.multiselect("Rounds to Aggregate", matrix["rounds"], default=matrix["rounds"])
+                with col2:
+                    view = st.radio("Show", ["Scores", "Percentiles", "Z-Scores"], horizontal=True)
+                with st.expander("⚖️ Category Weights"):
+                    weight_cols = st.columns(len(SCORE_CATEGORIES))
+                    weights = [
+                        weight_cols[k].slider(cat, 0.0, 5.0, 0.0 if cat == "Overall" else 1.0, 0.5, key=f"w_{cat}")
+                        for k, cat in enumerate(SCORE_CATEGORIES)
+                    ]
+
+                if not selected_rounds:
+                    st.warning("Select at least one round to aggregate.")
+                elif sum(weights) == 0:
+                    st.warning("Give at least one category a non-zero weight.")
+                else:
+                    round_idx = [matrix["rounds"].index(r) for r in selected_rounds]
+                    ranking = rank_candidates(matrix["scores"], round_idx, weights)
+                    values = {"Scores": ranking["agg"], "Percentiles": ranking["pct"], "Z-Scores": ranking["z"]}[view]
+                    order = ranking["order"]
+
+                    def cell(x):
+                        return None if np.isnan(x) else round(float(x), 2)
+
+                    n_weighted = sum(1 for w in weights if w > 0)
+                    table = {
+                        "Rank": [pos + 1 if not np.isnan(ranking["weighted"][i]) else None for pos, i in enumerate(order)],
+                        "Candidate": [matrix["names"][i] for i in order],
+                        "Weighted Score": [cell(ranking["weighted"][i]) for i in order],
+                        "Categories Scored": [f"{ranking['scored'][i]}/{n_weighted}" for i in order],
+                    }
+                    for k, cat in enumerate(SCORE_CATEGORIES):
+                        table[cat] = [cell(values[i, k]) for i in order]
+                    table["Recommendation"] = [matrix["recommendations"][i] for i in order]
                     st.divider()
-                    cols = st.columns(len(selected_candidates))
-                    for i, candidate in enumerate(selected_candidates):
-                        rounds = candidate.get("rounds", [])
-                        latest = rounds[-1] if rounds else {}
-                        report = latest.get("report", "")
-                        scores = extract_all_scores(report)
-                        rec = extract_recommendation(report)
-                        badge = "🟢" if "Yes" in str(rec) else ("🔴" if "No" in str(rec) else "🟡")
-                        with cols[i]:
-                            st.markdown(f"### {badge} {candidate['candidate_name']}")
-                            st.markdown(f"**Recommendation:** {rec}")
-                            st.divider()
-                            for cat, score in scores.items():
-                                st.metric(cat, f"{score}/10")
+                    st.subheader(f"🏆 Ranking — {len(order)} candidate(s)")
+                    st.dataframe(table, use_container_width=True, hide_index=True)
+                    st.caption(f"Candidates scored on less than {MIN_SCORE_COVERAGE:.0%} of the category weight are listed last without a rank.")
+
+                    ranked_names = [matrix["names"][i] for i in order]
+                    radar_names = st.multiselect("Candidates on Radar Chart", ranked_names, default=ranked_names[:3])
+                    if radar_names:
+                        r, theta, color = [], [], []
+                        for name in radar_names:
+                            i = matrix["names"].index(name)
+                            for k, cat in enumerate(SCORE_CATEGORIES):
+                                r.append(cell(ranking["agg"][i, k]))
+                                theta.append(cat)
+                                color.append(name)
+                        fig = px.line_polar(r=r, theta=theta, color=color, line_close=True, range_r=[0, 10])
+                        st.plotly_chart(fig, use_container_width=True)
 
     elif page == "📚 Question Bank":
         st.title("📚 Question Bank")
@@ -663,8 +1058,7 @@ else:
             save_q = st.form_submit_button("💾 Save Questions", use_container_width=True)
         if save_q:
             if role_key and qs_input:
-                bank[role_key] = bank.get(role_key, []) + [q.strip() for q in qs_input.split("\n") if q.strip()]
-                save_question_bank(bank)
+                save_questions(role_key, [q.strip() for q in qs_input.split("\n") if q.strip()])
                 st.success(f"Saved questions for '{role_key}'")
                 st.rerun()
             else:
@@ -678,8 +1072,7 @@ else:
                     for q in qs:
                         st.write(f"- {q}")
                     if st.button(f"🗑️ Delete all for '{r}'", key=f"del_{r}"):
-                        del bank[r]
-                        save_question_bank(bank)
+                        delete_questions(r)
                         st.rerun()
 
     elif page == "📈 Analytics":